@@ -1,4 +1,5 @@
 from .codeagent import run_codeagent
+from .fastpath import run_fastpath
 from .websearch_qa import run_websearch_qa
 
-__all__ = ["run_codeagent", "run_websearch_qa"]
+__all__ = ["run_codeagent", "run_fastpath", "run_websearch_qa"]
@@ -1,15 +1,21 @@
 import os
 import re
+import threading
 from pathlib import Path
 from textwrap import dedent
 
+import pandas as pd
 from hydra.core.hydra_config import HydraConfig
 from omegaconf import DictConfig
 from rich.console import Console
 from smolagents import CodeAgent, OpenAIModel
 from smolagents.monitoring import AgentLogger
 
+from portfolio_chat.storage.artifacts import store_result
+
 loggers: dict[str, AgentLogger] = dict()
+models: dict[str, OpenAIModel] = dict()
+_lock = threading.RLock()  # models may be warmed up from a prefetch thread
 
 
 def extract_last_agent_code(session_id: str) -> str | None:
@@ -27,7 +33,9 @@ def extract_last_agent_code(session_id: str) -> str | None:
 
 def get_logger(session_id: str) -> AgentLogger:
     global loggers
-    if session_id not in loggers:
+    with _lock:
+        if session_id in loggers:
+            return loggers[session_id]
         if HydraConfig.initialized():
             wd = HydraConfig.get().runtime.output_dir
         else:
@@ -44,20 +52,40 @@ def get_logger(session_id: str) -> AgentLogger:
                 width=120,
             )
         )
-    return loggers[session_id]
+        return loggers[session_id]
+
+
+def get_model(cfg: DictConfig, model_id: str | None = None) -> OpenAIModel:
+    """Returns the shared model client for `model_id`, creating it on first use."""
+    global models
+    model_id = model_id or cfg.model.name
+    with _lock:
+        if model_id not in models:
+            models[model_id] = OpenAIModel(model_id=model_id, api_key=cfg.model.api_key)
+        return models[model_id]
 
 
 def run_codeagent(
-    cfg: DictConfig, system_prompt: str, query: str, session_id: str = "0"
+    cfg: DictConfig,
+    system_prompt: str,
+    query: str,
+    session_id: str = "0",
+    model_id: str | None = None,
 ) -> str:
-    model = OpenAIModel(model_id=cfg.model.name, api_key=cfg.model.api_key)
+    # A new agent per query: its Python executor keeps variables between runs.
     agent = CodeAgent(
         tools=[],
-        model=model,
+        model=get_model(cfg, model_id),
         add_base_tools=True,
         use_structured_outputs_internally=True,
         additional_authorized_imports=["csv", "pandas", "pgeocode", "numpy"],
         logger=get_logger(session_id),
     )
     response = agent.run(system_prompt + f" Query: {query}")
+    if isinstance(response, pd.DataFrame | pd.Series) and cfg.get("artifacts"):
+        text = str(response)
+        # Small tables stay inline, mirroring the 10-row rule in the system prompt.
+        if len(response) <= 10 and len(text) <= cfg.artifacts.inline_chars:
+            return text
+        return store_result(cfg.artifacts, response)
     return str(response)
@@ -0,0 +1,376 @@
+import os
+import re
+import threading
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from omegaconf import DictConfig
+
+from portfolio_chat.storage.snapshots import SnapshotStore, find_snapshots
+
+TABLES = {"clients": "Clients", "collateral": "Collateral", "loans": "Loans"}
+
+_frames: dict[str, tuple[float, pd.DataFrame]] = dict()
+_stores: dict[str, SnapshotStore] = dict()
+_store_lock = threading.Lock()  # stores are updated from the ingestion thread
+
+
+class Intent(NamedTuple):
+    name: str
+    pattern: re.Pattern[str]
+    answer: Callable[[DictConfig, re.Match[str]], str | None]
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    """Read a portfolio CSV once and reuse it until the file changes on disk."""
+    mtime = os.path.getmtime(path)
+    cached = _frames.get(path)
+    if cached is None or cached[0] != mtime:
+        _frames[path] = (mtime, pd.read_csv(path, encoding="latin1"))
+    return _frames[path][1]
+
+
+def current_paths(cfg: DictConfig) -> dict[str, str]:
+    """
+    Paths of the portfolio CSVs, taken from the latest dated snapshot in the data
+    directory. The configured paths are used for tables it does not contain.
+    """
+    paths = {key: str(cfg[key]) for key in (*TABLES, "rating_scale")}
+    if "snapshots" in cfg:
+        found = find_snapshots(cfg.snapshots.data_dir)
+        if found:
+            latest = found[max(found)]
+            for key, table in TABLES.items():
+                if table in latest:
+                    paths[key] = str(latest[table])
+    return paths
+
+
+def portfolio_prompt(backend: DictConfig) -> str:
+    """The code agent's system prompt with the current CSV paths filled in."""
+    if "fastpath" not in backend:
+        return backend.system_prompt
+    return backend.system_prompt.format(**current_paths(backend.fastpath))
+
+
+def _load(cfg: DictConfig, key: str) -> pd.DataFrame:
+    return _read_csv(current_paths(cfg)[key])
+
+
+def _single_currency(frame: pd.DataFrame, column: str) -> str | None:
+    """Return the only currency in `column`, or None if amounts can't be summed."""
+    currencies = frame[column].dropna().unique()
+    return str(currencies[0]) if len(currencies) == 1 else None
+
+
+def _values(frame: pd.DataFrame, column: str) -> np.ndarray | None:
+    """Return `column` as floats, or None if any value is missing."""
+    values = frame[column].to_numpy(dtype=float)
+    return None if np.isnan(values).any() else values
+
+
+def _exposure_total(loans: pd.DataFrame) -> float | None:
+    exposure = _values(loans, "Exposure")
+    if exposure is None or _single_currency(loans, "ExposureCCY") is None:
+        return None
+    return exposure.sum()
+
+
+def _collateral_total(collateral: pd.DataFrame) -> float | None:
+    value = _values(collateral, "PropertyMarketValue")
+    if value is None or _single_currency(collateral, "PropertyMarketValue_CCY") is None:
+        return None
+    return value.sum()
+
+
+def _expected_loss_total(loans: pd.DataFrame, scale: pd.DataFrame) -> float | None:
+    pds = loans["Rating"].map(scale.set_index("Rating")["Midpoint PD"])
+    pds = pds.to_numpy(dtype=float)
+    lgd = _values(loans, "LGD")
+    exposure = _values(loans, "Exposure")
+    if lgd is None or exposure is None:
+        return None
+    if _single_currency(loans, "ExposureCCY") is None:
+        return None
+    if np.isnan(pds).any() or (lgd > 1).any():
+        return None  # unmapped ratings or LGD given in percent
+    return (pds * lgd * exposure).sum()
+
+
+def _loan_count(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    loans = _load(cfg, "loans")
+    return f"There are {len(loans):,} loan exposures in the portfolio."
+
+
+def _client_count(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    clients = _load(cfg, "clients")
+    return f"There are {len(clients):,} clients in the portfolio."
+
+
+def _total_exposure(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    loans = _load(cfg, "loans")
+    total = _exposure_total(loans)
+    if total is None:
+        return None
+    ccy = loans["ExposureCCY"].dropna().iloc[0]
+    return f"The total exposure of the portfolio is {total:,.2f} {ccy}."
+
+
+def _total_collateral(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    collateral = _load(cfg, "collateral")
+    total = _collateral_total(collateral)
+    if total is None:
+        return None
+    ccy = collateral["PropertyMarketValue_CCY"].dropna().iloc[0]
+    return f"The total collateral market value of the portfolio is {total:,.2f} {ccy}."
+
+
+def _largest_income(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    income = _values(_load(cfg, "clients"), "Income")
+    if income is None:
+        return None
+    return f"The largest income across all clients is {income.max():,.2f}."
+
+
+def _longest_maturity(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    maturity = _load(cfg, "loans")["Maturity"]
+    if maturity.isna().any():
+        return None
+    if pd.api.types.is_numeric_dtype(maturity):
+        # Only YYYYMMDD integers are understood; other numbers have no known unit.
+        if not pd.api.types.is_integer_dtype(maturity):
+            return None
+        dates = pd.to_datetime(maturity.astype(str), format="%Y%m%d", errors="coerce")
+        if dates.isna().any():
+            return None
+        return f"The longest maturity loan has a maturity of {maturity.max()}."
+    dates = pd.to_datetime(maturity, errors="coerce")
+    if dates.isna().any():  # unparseable values, let the agent handle them
+        return None
+    return f"The longest maturity loan matures on {dates.max():%Y-%m-%d}."
+
+
+def _defaulted_exposure(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    loans = _load(cfg, "loans")
+    scale = _load(cfg, "rating_scale")
+    # A rating is in default when its whole PD band sits at the top of the scale.
+    defaulted = scale.loc[
+        scale["Lower Bound PD"] >= scale["Upper Bound PD"].max(), "Rating"
+    ]
+    ccy = _single_currency(loans, "ExposureCCY")
+    if defaulted.empty or ccy is None:
+        return None
+    exposure = _values(loans, "Exposure")
+    if exposure is None:
+        return None
+    total = exposure[loans["Rating"].isin(defaulted).to_numpy()].sum()
+    return f"The total exposure of defaulted loans is {total:,.2f} {ccy}."
+
+
+def _expected_loss(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    loans = _load(cfg, "loans")
+    total = _expected_loss_total(loans, _load(cfg, "rating_scale"))
+    if total is None:
+        return None
+    ccy = loans["ExposureCCY"].dropna().iloc[0]
+    return f"The total expected loss across the portfolio is {total:,.2f} {ccy}."
+
+
+def _metric_trend(cfg: DictConfig, match: re.Match[str]) -> str | None:
+    if "snapshots" not in cfg:
+        return None
+    # Don't wait for a running ingestion; the agent can answer in the meantime.
+    if not _store_lock.acquire(blocking=False):
+        return None
+    try:
+        return _metric_trend_answer(_get_store(cfg.snapshots.root), cfg, match)
+    finally:
+        _store_lock.release()
+
+
+def _get_store(root: str) -> SnapshotStore:
+    if root not in _stores:
+        _stores[root] = SnapshotStore(root)
+    return _stores[root]
+
+
+def _metric_trend_answer(
+    store: SnapshotStore, cfg: DictConfig, match: re.Match[str]
+) -> str | None:
+    found = find_snapshots(cfg.snapshots.data_dir)
+    if not store.dates or (found and max(found) > store.dates[-1]):
+        return None  # the latest files are not ingested yet
+
+    metric, unit, count = match["metric"], match["unit"], match["count"]
+    if "loss" in metric:
+        scale = _load(cfg, "rating_scale")
+        name = "expected loss"
+        series = store.series(lambda t: _expected_loss_total(t["Loans"], scale))
+    elif "collateral" in metric:
+        name = "total collateral market value"
+        series = store.series(lambda t: _collateral_total(t["Collateral"]))
+    else:
+        name = "total exposure"
+        series = store.series(lambda t: _exposure_total(t["Loans"]))
+
+    if unit is not None:
+        months = 12 * int(count or 1) if unit.startswith("year") else int(count or 1)
+        latest = pd.Timestamp(store.dates[-1])
+        start = latest - pd.DateOffset(months=months)
+        series = series[pd.to_datetime(series.index) >= start]
+    if len(series) < 2 or series.isna().any():
+        return None
+
+    lines = [f"- {date}: {value:,.2f}" for date, value in series.items()]
+    change = series.iloc[-1] - series.iloc[0]
+    relative = f" ({change / series.iloc[0]:+.1%})" if series.iloc[0] else ""
+    return (
+        f"The {name} of the portfolio per snapshot:\n"
+        + "\n".join(lines)
+        + f"\nChange from {series.index[0]} to {series.index[-1]}: "
+        f"{change:+,.2f}{relative}."
+    )
+
+
+_PORTFOLIO = r"(?: (?:in|of|across) (?:the|my) portfolio)?"
+
+INTENTS = [
+    Intent(
+        "loan_count",
+        re.compile(
+            r"(?:how many (?:loans?|loan exposures|exposures)(?: do i have| are there)?"
+            r"|what is the (?:number|count) of (?:loans|loan exposures))" + _PORTFOLIO
+        ),
+        _loan_count,
+    ),
+    Intent(
+        "client_count",
+        re.compile(
+            r"(?:how many clients(?: do i have| are there)?"
+            r"|what is the (?:number|count) of clients)" + _PORTFOLIO
+        ),
+        _client_count,
+    ),
+    Intent(
+        "total_exposure",
+        re.compile(r"what is the total (?:loan )?exposure" + _PORTFOLIO),
+        _total_exposure,
+    ),
+    Intent(
+        "total_collateral",
+        re.compile(
+            r"what is the total (?:collateral (?:market )?value"
+            r"|(?:market )?value of (?:the )?collateral)" + _PORTFOLIO
+        ),
+        _total_collateral,
+    ),
+    Intent(
+        "largest_income",
+        re.compile(
+            r"what is the (?:largest|highest|maximum) (?:client )?income"
+            r"(?: (?:across|among|of) all clients)?"
+        ),
+        _largest_income,
+    ),
+    Intent(
+        "longest_maturity",
+        re.compile(
+            r"what is the (?:maturity of the longest(?:[- ]maturity)? loan"
+            r"|longest (?:loan )?maturity)" + _PORTFOLIO
+        ),
+        _longest_maturity,
+    ),
+    Intent(
+        "defaulted_exposure",
+        re.compile(r"what is the total exposure of (?:the |all )?defaulted loans"),
+        _defaulted_exposure,
+    ),
+    Intent(
+        "expected_loss",
+        re.compile(
+            r"what is the total expected loss" + _PORTFOLIO + r"(?: \([^)]*\))?"
+        ),
+        _expected_loss,
+    ),
+    Intent(
+        "metric_trend",
+        re.compile(
+            r"how (?:has|did) (?:the )?(?P<metric>(?:total )?(?:expected loss|exposure"
+            r"|collateral (?:market )?value))"
+            + _PORTFOLIO
+            + r" (?:changed|evolved|developed)"
+            r"(?: over (?:the )?(?:last|past) (?:(?P<count>\d+) )?(?P<unit>years?|months?))?"
+        ),
+        _metric_trend,
+    ),
+]
+
+
+def warm_fastpath(cfg: DictConfig) -> None:
+    """Loads the current portfolio CSVs ahead of the first query."""
+    for path in current_paths(cfg).values():
+        _read_csv(path)
+
+
+def ingest_snapshots(cfg: DictConfig) -> list[str]:
+    """Ingests snapshot files newer than the store and returns their dates."""
+    if "snapshots" not in cfg:
+        return []
+    with _store_lock:
+        return _get_store(cfg.snapshots.root).ingest_dir(cfg.snapshots.data_dir)
+
+
+def ingest_in_background(cfg: DictConfig) -> threading.Thread:
+    """Runs `ingest_snapshots` in a daemon thread; trends wait for it to finish."""
+    thread = threading.Thread(
+        target=ingest_snapshots, args=(cfg,), name="snapshot-ingest", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _normalize(sentence: str) -> str:
+    return re.sub(r"\s+", " ", sentence.lower()).strip(" ?.!")
+
+
+def match_intents(query: str) -> list[tuple[Intent, re.Match[str]]] | None:
+    """Match every sentence of the query to an intent, or return None."""
+    sentences = [s for s in re.split(r"(?<=[?.!])\s+", query.strip()) if s]
+    matched = []
+    for sentence in map(_normalize, sentences):
+        match = next(
+            (
+                (intent, m)
+                for intent in INTENTS
+                if (m := intent.pattern.fullmatch(sentence))
+            ),
+            None,
+        )
+        if match is None:
+            return None
+        matched.append(match)
+    return matched or None
+
+
+def run_fastpath(cfg: DictConfig, query: str) -> str | None:
+    """
+    Answers common single-aggregate portfolio questions directly with pandas.
+
+    Returns None whenever the query is not fully recognized or the data does not
+    allow an unambiguous answer, in which case the caller should use the agent.
+    """
+    intents = match_intents(query)
+    if intents is None:
+        return None
+    answers = []
+    for intent, match in intents:
+        try:
+            answer = intent.answer(cfg, match)
+        except (OSError, KeyError, ValueError, TypeError):
+            return None
+        if answer is None:
+            return None
+        answers.append(answer)
+    return " ".join(answers)
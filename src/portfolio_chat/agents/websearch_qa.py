@@ -2,15 +2,17 @@ from omegaconf import DictConfig
 from openai import OpenAI
 
 
-def run_websearch_qa(cfg: DictConfig, system_prompt: str, query: str) -> str:
+def run_websearch_qa(
+    cfg: DictConfig, system_prompt: str, query: str, model_id: str | None = None
+) -> str:
     """
     Answers finance-related questions using the OpenAI Responses API
     with optional live web search.
     """
-    client = OpenAI(api_key=cfg.api_key, base_url=cfg.base_url)
+    client = OpenAI(api_key=cfg.model.api_key, base_url=cfg.model.base_url)
 
     response = client.responses.create(
-        model=cfg.name,
+        model=model_id or cfg.model.name,
         tools=[{"type": "web_search"}],
         input=[
             {"role": "system", "content": system_prompt},
@@ -1,38 +1,89 @@
+from uuid import uuid4
+
 from omegaconf import DictConfig
 
+from .runtime.persistence import SessionLog
 from .runtime.session import ChatSession
 from .ui.rich_ui import UI
 
 EXIT_COMMAND = "/quit"
 RESTART_COMMAND = "/reset"
+SAVE_COMMAND = "/save"
+RESUME_COMMAND = "/resume"
 HELP_COMMAND = "/help"
 
 
+def new_session_id() -> str:
+    # The letter prefix stops Hydra from parsing ids like 1e345678 as numbers.
+    return f"s{uuid4().hex[:8]}"
+
+
 class ChatApp:
     """Main application class for the chat interface."""
 
     def __init__(self, cfg: DictConfig):
         self.cfg = cfg
         self.ui = UI()
-        self.session = ChatSession(cfg)
+        if cfg.get("session_id") is not None:
+            try:
+                self.session = ChatSession.resume(str(cfg.session_id), cfg)
+                return
+            except FileNotFoundError as e:
+                self.ui.banner(f"{e}. Starting a new session.")
+        self.session = ChatSession(cfg, session_id=new_session_id())
+
+    def replace_session(self, session: ChatSession):
+        """Switches to `session`, releasing the previous one's resources."""
+        self.session.close()
+        self.session = session
+
+    def resume(self, session_id: str):
+        """Replaces the current session with a saved one, or lists saved sessions."""
+        if not session_id:
+            sessions = SessionLog.list_sessions(self.cfg.sessions_dir)
+            self.ui.banner("Saved sessions:" if sessions else "No saved sessions.")
+            for saved in sessions:
+                self.ui.console.print(f" - {saved}")
+            return
+        self.replace_session(ChatSession.resume(session_id, self.cfg))
+        self.ui.banner(
+            f"Resumed session {session_id} ({len(self.session.history)} items)"
+        )
 
     def run(self):
         """Starts the chat loop."""
-        self.ui.banner("Chat session initialized.")
+        self.ui.banner(f"Chat session {self.session.session_id} initialized.")
         while True:
             try:
                 text = self.ui.prompt("> ").strip()
+                command, _, argument = text.partition(" ")
                 if text.lower() == EXIT_COMMAND:
                     self.ui.assistant("Bye!")
                     break
                 elif text.lower() == RESTART_COMMAND:
-                    self.ui.banner("Restarted chat session")
-                    self.session = ChatSession(self.cfg)
+                    self.replace_session(
+                        ChatSession(self.cfg, session_id=new_session_id())
+                    )
+                    self.ui.banner(f"Restarted chat session {self.session.session_id}")
+                    continue
+                elif text.lower() == SAVE_COMMAND:
+                    if self.session.log is None:
+                        self.ui.banner("Saving is disabled (no sessions_dir).")
+                        continue
+                    self.session.save()
+                    self.ui.banner(f"Saved session {self.session.session_id}")
+                    continue
+                elif command.lower() == RESUME_COMMAND:
+                    self.resume(argument.strip())
                     continue
                 elif text.lower() == HELP_COMMAND:
                     self.ui.banner("Available commands:")
                     self.ui.console.print(f" - {EXIT_COMMAND}: Exit the chat")
                     self.ui.console.print(f" - {RESTART_COMMAND}: Restart the chat")
+                    self.ui.console.print(f" - {SAVE_COMMAND}: Save the chat")
+                    self.ui.console.print(
+                        f" - {RESUME_COMMAND} [id]: Resume a saved chat, or list them"
+                    )
                     self.ui.console.print(f" - {HELP_COMMAND}: Show this help message")
                     continue
 
@@ -10,15 +10,22 @@ from datetime import datetime
 import hydra
 from omegaconf import DictConfig
 
-from portfolio_chat.agents import run_codeagent
-
-
-def run_query(cfg: DictConfig, query: str) -> str:
+from portfolio_chat.agents import run_codeagent, run_fastpath
+from portfolio_chat.agents.fastpath import ingest_snapshots, portfolio_prompt
+from portfolio_chat.runtime.router import complexity, update_success_rates
+
+
+def run_query(cfg: DictConfig, query: str) -> tuple[str, str]:
+    """Answers the query, returning the answer and the engine that produced it."""
+    backend = cfg.tools.query_portfolio_analyst.backend
+    fastpath = backend.get("fastpath")
+    if fastpath and fastpath.enabled:
+        answer = run_fastpath(fastpath, query)
+        if answer is not None:
+            return answer, "fastpath"
     return run_codeagent(
-        cfg,
-        system_prompt=cfg.tools.query_portfolio_analyst.backend.system_prompt,
-        query=query,
-    )
+        cfg, system_prompt=portfolio_prompt(backend), query=query
+    ), "codeagent"
 
 
 def extract_largest_number(text: str):
@@ -49,11 +56,17 @@ def run_dataset(cfg: DictConfig):
         "Q",
         "A",
         "agent_answer",
+        "engine",
         "extracted_number",
         "Correct",
     ]
 
+    fastpath = cfg.tools.query_portfolio_analyst.backend.get("fastpath")
+    if fastpath and fastpath.enabled:
+        ingest_snapshots(fastpath)  # so trend questions see every snapshot
+
     buffer = []
+    success = []  # (complexity, correct) of agent answers, for the model router
 
     with (
         open(INPUT_PATH, newline="", encoding="utf-8", errors="replace") as fin,
@@ -68,7 +81,7 @@ def run_dataset(cfg: DictConfig):
                 query = row["Q"]
                 print(f"Running query {i}: {query}")
 
-                answer = run_query(cfg, query)
+                answer, engine = run_query(cfg, query)
                 extracted = extract_largest_number(answer)
 
                 try:
@@ -77,10 +90,13 @@ def run_dataset(cfg: DictConfig):
                     gold = None
 
                 correct = is_equal(extracted, gold) if (extracted and gold) else False
+                if engine == "codeagent":
+                    success.append((complexity(query), correct))
 
                 row_out = {
                     **row,
                     "agent_answer": answer,
+                    "engine": engine,
                     "extracted_number": extracted,
                     "Correct": correct,
                 }
@@ -89,6 +105,7 @@ def run_dataset(cfg: DictConfig):
                 row_out = {
                     **row,
                     "agent_answer": f"ERROR: {e}",
+                    "engine": None,
                     "extracted_number": None,
                     "Correct": False,
                 }
@@ -105,6 +122,8 @@ def run_dataset(cfg: DictConfig):
             writer.writerows(buffer)
             fout.flush()
 
+    if success and cfg.get("router"):
+        update_success_rates(cfg.router.stats, cfg.model.name, success)
     print(f"Saved results to {OUTPUT_PATH}")
 
 
@@ -3,12 +3,30 @@ from typing import Any
 from hydra.utils import call
 from omegaconf import DictConfig
 
-from portfolio_chat.agents import run_codeagent, run_websearch_qa
+from portfolio_chat.agents import run_codeagent, run_fastpath, run_websearch_qa
 from portfolio_chat.agents.codeagent import extract_last_agent_code
+from portfolio_chat.agents.fastpath import portfolio_prompt
+from portfolio_chat.storage.artifacts import store_result
+
+
+def compact_result(cfg: DictConfig, function: str, result: str) -> str:
+    """Replaces results longer than `artifacts.inline_chars` with a summary."""
+    artifacts = cfg.get("artifacts")
+    if not artifacts or not cfg.tools[function].get("store_output", True):
+        return result
+    if len(result) <= artifacts.inline_chars:
+        return result
+    return store_result(artifacts, result)
 
 
 def orchestrate(
-    function: str, cfg: DictConfig, session_id: str, spinner_context, **kwargs: Any
+    function: str,
+    cfg: DictConfig,
+    session_id: str,
+    spinner_context,
+    model_id: str | None = None,
+    use_fastpath: bool = True,
+    **kwargs: Any,
 ) -> str:
     with spinner_context("Analyzing..."):
         if function not in cfg.tools:
@@ -19,12 +37,19 @@ def orchestrate(
 
         match engine:
             case "codeagent":
+                fastpath = backend.get("fastpath")
+                if use_fastpath and fastpath and fastpath.enabled:
+                    result = run_fastpath(fastpath, **kwargs)
+                    if result is not None:
+                        return result
                 result = run_codeagent(
                     cfg,
-                    system_prompt=backend.system_prompt,
+                    system_prompt=portfolio_prompt(backend),
                     session_id=session_id,
+                    model_id=model_id,
                     **kwargs,
                 )
+                result = compact_result(cfg, function, result)
                 code = extract_last_agent_code(session_id)
                 if code:
                     result += (
@@ -32,12 +57,17 @@ def orchestrate(
                     )
                 return result
             case "websearch_qa":
-                return run_websearch_qa(
-                    cfg, system_prompt=backend.system_prompt, **kwargs
+                result = run_websearch_qa(
+                    cfg,
+                    system_prompt=backend.system_prompt,
+                    model_id=model_id,
+                    **kwargs,
                 )
+                return compact_result(cfg, function, result)
             case "stress_test":
                 return "Stress test executed. Results are positive."
             case "callable":
-                return call(cfg.tools[function].backend.callable, **kwargs)
+                result = call(cfg.tools[function].backend.callable, **kwargs)
+                return compact_result(cfg, function, result)
             case _:
                 raise ValueError(f"Unknown backend type: {backend.type}")
@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+from typing import Any
+
+
+def _to_json(item: Any) -> dict:
+    """Converts a history item, either a dict or an OpenAI response item."""
+    if hasattr(item, "model_dump"):
+        return item.model_dump(mode="json", exclude_none=True)
+    return item
+
+
+class SessionLog:
+    """
+    Append-only JSONL log of a chat session's history.
+
+    Each line is one history item: messages, model outputs, tool calls and tool
+    outputs (which include the code executed by the code agent). Loading the
+    log restores the history exactly as it will be sent to the model.
+
+    Args:
+        directory (str | Path): Directory holding one `<session_id>.jsonl` per session.
+        session_id (str): The session to read or write.
+    """
+
+    def __init__(self, directory: str | Path, session_id: str):
+        self.path = Path(directory) / f"{session_id}.jsonl"
+
+    @staticmethod
+    def list_sessions(directory: str | Path) -> list[str]:
+        """Returns saved session IDs, most recently updated first."""
+        paths = sorted(
+            Path(directory).glob("*.jsonl"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        return [p.stem for p in paths]
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def write(self, items: list, append: bool = True) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a" if append else "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(_to_json(item), separators=(",", ":")) + "\n")
+
+    def load(self) -> list[dict]:
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,127 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from hydra.utils import call
+from omegaconf import DictConfig
+
+from portfolio_chat.agents.codeagent import get_logger, get_model
+from portfolio_chat.agents.fastpath import warm_fastpath
+
+
+def _warm_codeagent(
+    cfg: DictConfig, backend: DictConfig, session_id: str, model_ids: list[str]
+) -> None:
+    fastpath = backend.get("fastpath")
+    if fastpath and fastpath.enabled:
+        warm_fastpath(fastpath)
+    get_logger(session_id)
+    for model_id in model_ids:
+        get_model(cfg, model_id)
+
+
+class Prefetcher:
+    """
+    Starts tool work speculatively while the model is still streaming its output.
+
+    When a tool call is first named, its backend is warmed up: the code agent's
+    model clients are created and the portfolio data is loaded, and a tool's
+    optional `warmup` callable is run. A `callable` tool is run speculatively with its partial
+    input once the input stops streaming for `debounce` seconds, and again
+    with its final arguments if those differ. Results are claimed with `take`;
+    anything unclaimed at the end of a turn is dropped by `discard`.
+
+    Args:
+        cfg (DictConfig): The configuration object.
+        session_id (str): The session ID whose code agent logger should be opened.
+        model_ids (list[str]): The models a code agent may be run with.
+        debounce (float, optional): Input pause before a speculative call.
+            Defaults to 0.25 seconds.
+    """
+
+    def __init__(
+        self,
+        cfg: DictConfig,
+        session_id: str,
+        model_ids: list[str],
+        debounce: float = 0.25,
+    ):
+        self.cfg = cfg
+        self.session_id = session_id
+        self.model_ids = model_ids
+        self.debounce = debounce
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+        self.warmups: list[Future] = []
+        self.calls: dict[tuple[str, str], Future] = {}
+        self.claimed: set[tuple[str, str]] = set()  # taken calls, never resubmitted
+        self.timers: dict[str, threading.Timer] = {}  # output item id -> timer
+        self._lock = threading.Lock()  # calls are also added from timer threads
+
+    def on_tool_named(self, tool_name: str) -> None:
+        if tool_name not in self.cfg.tools:
+            return
+        tool = self.cfg.tools[tool_name]
+        if getattr(tool.backend, "engine", tool.backend) == "codeagent":
+            self.warmups.append(
+                self.executor.submit(
+                    _warm_codeagent,
+                    self.cfg,
+                    tool.backend,
+                    self.session_id,
+                    self.model_ids,
+                )
+            )
+        if "warmup" in tool:
+            self.warmups.append(self.executor.submit(call, tool.warmup))
+
+    def on_tool_args(self, tool_name: str, kwargs: dict[str, Any]) -> None:
+        if tool_name not in self.cfg.tools:
+            return
+        backend = self.cfg.tools[tool_name].backend
+        if getattr(backend, "engine", backend) != "callable":
+            return
+        key = (tool_name, json.dumps(kwargs, sort_keys=True))
+        with self._lock:
+            if key not in self.calls and key not in self.claimed:
+                self.calls[key] = self.executor.submit(call, backend.callable, **kwargs)
+
+    def on_tool_input(self, item_id: str, tool_name: str, kwargs: dict[str, Any]):
+        """Runs the tool with streamed input once it pauses for `debounce`."""
+        if item_id in self.timers:
+            self.timers[item_id].cancel()
+        timer = threading.Timer(self.debounce, self.on_tool_args, (tool_name, kwargs))
+        timer.daemon = True
+        self.timers[item_id] = timer
+        timer.start()
+
+    def on_tool_input_done(self, item_id: str, tool_name: str, kwargs: dict[str, Any]):
+        """Runs the tool with its final input, dropping the pending debounced call."""
+        timer = self.timers.pop(item_id, None)
+        if timer is not None:
+            timer.cancel()
+        self.on_tool_args(tool_name, kwargs)
+
+    def take(self, tool_name: str, kwargs: dict[str, Any]) -> Future | None:
+        """Claims the speculative call matching the tool's final arguments."""
+        key = (tool_name, json.dumps(kwargs, sort_keys=True))
+        with self._lock:
+            self.claimed.add(key)
+            return self.calls.pop(key, None)
+
+    def discard(self) -> None:
+        """Cancels or forgets all speculative work that was not claimed."""
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+        with self._lock:
+            for future in [*self.warmups, *self.calls.values()]:
+                future.cancel()
+            self.warmups.clear()
+            self.calls.clear()
+            self.claimed.clear()
+
+    def close(self) -> None:
+        """Drops pending work and stops the worker threads."""
+        self.discard()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from hydra.core.hydra_config import HydraConfig
+from omegaconf import DictConfig
+
+from portfolio_chat.agents.fastpath import match_intents
+
+COMPLEX_KEYWORDS = (
+    "if ",
+    "scenario",
+    "stress",
+    "shock",
+    "downturn",
+    "crisis",
+    "weighted",
+    "duration",
+    "concentration",
+    "risk",
+    "why",
+    "compare",
+    "explain",
+    "per ",
+    "each",
+    "most",
+    "top ",
+    "%",
+)
+# Only agent-failure signals: a hedged or error opening, or hitting max steps.
+LOW_CONFIDENCE = re.compile(
+    r"^\s*(?:i'?m not sure|i am not sure|error\b"
+    r"|i (?:cannot|can't|could not|couldn't|am unable to) (?:determine|answer|find))"
+    r"|reached max steps",
+    flags=re.IGNORECASE,
+)
+
+
+def complexity(query: str) -> int:
+    """Buckets a query into 0 (simple lookup), 1 (moderate) or 2 (complex)."""
+    if match_intents(query):
+        return 0
+    text = query.lower()
+    words = len(text.split())
+    questions = max(text.count("?"), 1)
+    keywords = sum(keyword in text for keyword in COMPLEX_KEYWORDS)
+    if keywords >= 2 or words > 40 or questions > 2:
+        return 2
+    if keywords == 1 or words > 15 or questions > 1:
+        return 1
+    return 0
+
+
+def is_low_confidence(answer: str) -> bool:
+    return not answer.strip() or LOW_CONFIDENCE.search(answer) is not None
+
+
+def update_success_rates(path: str, model: str, results: list[tuple[int, bool]]):
+    """Adds (complexity, correct) eval results for `model` to the stats file."""
+    stats_path = Path(path)
+    stats = json.loads(stats_path.read_text()) if stats_path.exists() else {}
+    buckets = stats.setdefault(model, {})
+    for bucket, correct in results:
+        counts = buckets.setdefault(str(bucket), [0, 0])
+        counts[0] += int(correct)
+        counts[1] += 1
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    stats_path.write_text(json.dumps(stats, indent=2))
+
+
+class ModelRouter:
+    """
+    Picks a model per chat turn and per tool call from cheap query signals.
+
+    Queries are bucketed by `complexity`, and each bucket starts at the tier of
+    the same index. Eval success rates measure the code agent, so for code agent
+    calls with enough eval results, the smallest tier that meets
+    `min_success_rate` for the bucket is used instead. Every decision is
+    appended to `routing.jsonl` in the session's output directory.
+
+    Args:
+        cfg (DictConfig): The router configuration.
+        session_id (str, optional): The session ID for logging purposes.
+    """
+
+    def __init__(self, cfg: DictConfig, session_id: str = "0"):
+        self.cfg = cfg
+        self.tiers = list(cfg.tiers)
+        self.session_id = session_id
+        stats_path = Path(cfg.stats)
+        self.stats = json.loads(stats_path.read_text()) if stats_path.exists() else {}
+
+        wd = (
+            HydraConfig.get().runtime.output_dir
+            if HydraConfig.initialized()
+            else "outputs"
+        )
+        os.makedirs(f"{wd}/{session_id}", exist_ok=True)
+        self.log_path = f"{wd}/{session_id}/routing.jsonl"
+
+    def _success_rate(self, model: str, bucket: int) -> float | None:
+        correct, total = self.stats.get(model, {}).get(str(bucket), (0, 0))
+        if total < self.cfg.min_samples:
+            return None
+        return correct / total
+
+    def route(self, scope: str, query: str, use_stats: bool = False) -> str:
+        """Returns the model for a turn (`scope="turn"`) or a tool call.
+
+        Args:
+            scope (str): "turn" or the name of the tool being called.
+            query (str): The user prompt or tool query.
+            use_stats (bool, optional): Whether to use eval success rates, which
+                only apply to the code agent. Defaults to False.
+        """
+        bucket = complexity(query)
+        start = min(bucket, len(self.tiers) - 1)
+        tier, reason = len(self.tiers) - 1, "fallback"
+        for i, model in enumerate(self.tiers):
+            rate = self._success_rate(model, bucket) if use_stats else None
+            if rate is not None and rate >= self.cfg.min_success_rate:
+                tier, reason = i, f"success rate {rate:.0%}"
+                break
+            if rate is None and i >= start:
+                tier, reason = i, "complexity"
+                break
+        model = self.tiers[tier]
+        self.record(scope, model, reason, complexity=bucket)
+        return model
+
+    def escalate(self, scope: str, model: str, reason: str) -> str | None:
+        """Returns the next larger tier after `model`, or None if at the top."""
+        tier = self.tiers.index(model) + 1 if model in self.tiers else len(self.tiers)
+        if tier >= len(self.tiers):
+            return None
+        self.record(scope, self.tiers[tier], f"escalated: {reason}")
+        return self.tiers[tier]
+
+    def record(self, scope: str, model: str, reason: str, **extra) -> None:
+        entry = {"time": time.time(), "scope": scope, "model": model, "reason": reason}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**entry, **extra}) + "\n")
@@ -8,9 +8,16 @@ from hydra.core.global_hydra import GlobalHydra
 from omegaconf import DictConfig
 from openai import OpenAI
 
-from .orchestrator import orchestrate
+from portfolio_chat.agents.fastpath import ingest_in_background, run_fastpath
+
+from .orchestrator import compact_result, orchestrate
+from .persistence import SessionLog
+from .prefetch import Prefetcher
+from .router import ModelRouter, is_low_confidence
 from .toolspecs import load_toolspecs
 
+MODEL_ENGINES = ("codeagent", "websearch_qa")
+
 
 class ChatSession:
     """
@@ -19,7 +26,7 @@ class ChatSession:
     Args:
         cfg (DictConfig): The configuration object containing API settings and prompts.
         overrides (list[str], optional): List of configuration overrides. Defaults to None.
-        session_id (int, optional): The session ID for logging purposes. Defaults to 0
+        session_id (str, optional): The session ID for logging and saving. Defaults to "0"
 
     Raises:
         ValueError: If both cfg and overrides are provided.
@@ -47,11 +54,64 @@ class ChatSession:
         self.model = cfg.model.name
         self.gen_kwargs = cfg.model.get("generation_kwargs", {})
         self.tools = load_toolspecs(cfg)
+        self.router = (
+            ModelRouter(cfg.router, session_id)
+            if cfg.get("router") and cfg.router.enabled
+            else None
+        )
+        self._tool_failed = False
+        self.prefetcher = (
+            Prefetcher(
+                cfg, session_id, self.router.tiers if self.router else [self.model]
+            )
+            if cfg.get("prefetch", False)
+            else None
+        )
+
+        for tool in cfg.tools.values():
+            if getattr(tool.backend, "engine", tool.backend) == "codeagent":
+                fastpath = tool.backend.get("fastpath")
+                if fastpath and fastpath.enabled:
+                    ingest_in_background(fastpath)
+
+        self.log = (
+            SessionLog(cfg.sessions_dir, session_id)
+            if cfg.get("sessions_dir")
+            else None
+        )
+        self._saved = 0  # number of history items already written to the log
 
         self.history = []
         if getattr(cfg, "system_prompt", None):
             self.history.append({"role": "system", "content": cfg.system_prompt})
 
+    @classmethod
+    def resume(cls, session_id: str, cfg: DictConfig | None = None) -> "ChatSession":
+        """Restores a saved session's history without calling the model.
+
+        Raises:
+            FileNotFoundError: If no saved session with this ID exists.
+        """
+        session = cls(cfg, session_id=session_id)
+        if session.log is None or not session.log.exists():
+            session.close()
+            raise FileNotFoundError(f"No saved session: {session_id}")
+        session.history = session.log.load()
+        session._saved = len(session.history)
+        return session
+
+    def close(self) -> None:
+        """Releases background resources; call when the session is replaced."""
+        if self.prefetcher:
+            self.prefetcher.close()
+
+    def save(self) -> None:
+        """Appends history items added since the last save to the session log."""
+        if self.log is None:
+            return
+        self.log.write(self.history[self._saved :], append=self._saved > 0)
+        self._saved = len(self.history)
+
     def query(
         self, prompt: str, spinner_cm=None
     ) -> Generator[
@@ -67,15 +127,19 @@ class ChatSession:
         """
         spinner_cm = spinner_cm or nullcontext
         self.history.append({"role": "user", "content": prompt})
+        model = self.router.route("turn", prompt) if self.router else self.model
         stack = ExitStack()
         for _ in range(self.cfg.max_retries):
+            self._tool_failed = False
             with self.client.responses.stream(
-                model=self.model,
+                model=model,
                 input=self.history,
                 tools=self.tools,
                 **self.gen_kwargs,
             ) as stream:
                 tool_outputs = []
+                tool_names = {}  # output item id -> tool name, for prefetching
+                tool_inputs = {}  # output item id -> custom tool input so far
                 for event in stream:
                     match event.type:
                         case "response.output_text.delta":
@@ -94,6 +158,13 @@ class ChatSession:
                                 yield "on_tool_start", event.item.name
                                 yield "on_tool_args", event.item.input
 
+                            if self.prefetcher and event.item.type in (
+                                "function_call",
+                                "custom_tool_call",
+                            ):
+                                tool_names[event.item.id] = event.item.name
+                                self.prefetcher.on_tool_named(event.item.name)
+
                         case "response.output_item.done":
                             if event.item.type == "reasoning":
                                 stack.close()
@@ -124,14 +195,44 @@ class ChatSession:
 
                         case "response.custom_tool_call_input.delta":
                             yield "on_tool_args", event.delta
+                            if self.prefetcher and event.item_id in tool_names:
+                                tool_inputs[event.item_id] = (
+                                    tool_inputs.get(event.item_id, "") + event.delta
+                                )
+                                self.prefetcher.on_tool_input(
+                                    event.item_id,
+                                    tool_names[event.item_id],
+                                    {"query": tool_inputs[event.item_id]},
+                                )
 
                         case "response.function_call_arguments.delta":
                             yield "on_tool_args", event.delta
 
+                        case "response.custom_tool_call_input.done":
+                            if self.prefetcher and event.item_id in tool_names:
+                                self.prefetcher.on_tool_input_done(
+                                    event.item_id,
+                                    tool_names[event.item_id],
+                                    {"query": event.input},
+                                )
+
+                        case "response.function_call_arguments.done":
+                            if self.prefetcher and event.item_id in tool_names:
+                                self.prefetcher.on_tool_args(
+                                    tool_names[event.item_id],
+                                    json.loads(event.arguments),
+                                )
+
+            if self.prefetcher:
+                self.prefetcher.discard()
             self.history += stream.get_final_response().output
+            self.history.extend(tool_outputs)
+            if self.cfg.get("autosave", False):
+                self.save()
             if not tool_outputs:
                 break
-            self.history.extend(tool_outputs)
+            if self.router and self._tool_failed:
+                model = self.router.escalate("turn", model, "tool failure") or model
 
         else:  # Max retries exceeded
             yield "on_text", self.cfg.max_retries_exceeded_message
@@ -157,16 +258,63 @@ class ChatSession:
         Returns:
             Dict[str, Any]: The tool's response to be appended to the history.
         """
-        result = orchestrate(
-            tool_name,
-            self.cfg,
-            self.session_id,
-            spinner_context=spinner_context,
-            **kwargs,
-        )
+        result = None
+        future = self.prefetcher.take(tool_name, kwargs) if self.prefetcher else None
+        if future is not None:
+            try:
+                with spinner_context("Analyzing..."):
+                    result = compact_result(self.cfg, tool_name, future.result())
+            except Exception:
+                pass  # rerun the tool below to surface the error as usual
+        if result is None:
+            result = self._run_tool(tool_name, spinner_context, **kwargs)
+
         history_item = {
             "type": "custom_tool_call_output" if custom else "function_call_output",
             "call_id": tool_id,
             "output": result,
         }
         return result, history_item
+
+    def _run_tool(self, tool_name: str, spinner_context, **kwargs: Any) -> str:
+        """Runs a tool, routing and escalating its model when the router is enabled."""
+        model_id = None
+        if self.router and tool_name in self.cfg.tools:
+            backend = self.cfg.tools[tool_name].backend
+            engine = getattr(backend, "engine", backend)
+            if engine in MODEL_ENGINES:
+                # Fast-path answers use no model, so only route when there is none.
+                fastpath = backend.get("fastpath")
+                if fastpath and fastpath.enabled:
+                    with spinner_context("Analyzing..."):
+                        result = run_fastpath(fastpath, kwargs.get("query", ""))
+                    if result is not None:
+                        return result
+                model_id = self.router.route(
+                    tool_name,
+                    kwargs.get("query", ""),
+                    use_stats=engine == "codeagent",
+                )
+
+        while True:
+            try:
+                result = orchestrate(
+                    tool_name,
+                    self.cfg,
+                    self.session_id,
+                    spinner_context=spinner_context,
+                    model_id=model_id,
+                    use_fastpath=model_id is None,
+                    **kwargs,
+                )
+                failure = "low confidence" if is_low_confidence(result) else None
+            except Exception as e:
+                if model_id is None:
+                    raise
+                result, failure = f"Error: {e}", f"{type(e).__name__}: {e}"
+            if model_id is None or failure is None:
+                return result
+            model_id = self.router.escalate(tool_name, model_id, failure)  # type: ignore
+            if model_id is None:
+                self._tool_failed = True  # still failing on the largest model
+                return result
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import re
+from collections.abc import Callable
+from importlib.util import find_spec
+from pathlib import Path
+
+import pandas as pd
+from omegaconf import DictConfig
+
+PARQUET = find_spec("pyarrow") is not None
+ARTIFACT_ID = re.compile(r"[0-9a-f]{16}")
+PREVIEW_CHARS = 1000
+LINE_CHARS = 1000
+MAX_PAGE_ROWS = 100
+
+
+def _text_lines(text: str) -> list[str]:
+    """Splits text into lines, cutting long lines into `LINE_CHARS` pieces."""
+    return [
+        line[i : i + LINE_CHARS]
+        for line in text.splitlines()
+        for i in range(0, max(len(line), 1), LINE_CHARS)
+    ]
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for large tool results.
+
+    Tables are saved as Parquet (CSV if pyarrow is not installed) and long text
+    as plain text, named by a hash of their content so identical results are
+    stored once. When the store grows past `max_bytes`, the least recently used
+    artifacts are deleted.
+
+    Args:
+        root (str | Path): Directory holding the artifacts.
+        max_bytes (int, optional): Size limit of the store. Defaults to 500 MB.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 500_000_000):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _path(self, artifact_id: str) -> Path:
+        # IDs come from the model; anything but a hash could escape the store.
+        if not ARTIFACT_ID.fullmatch(artifact_id):
+            raise KeyError(f"Invalid artifact ID: {artifact_id}")
+        for path in self.root.glob(f"{artifact_id}.*"):
+            os.utime(path)  # mark as recently used
+            return path
+        raise KeyError(f"Unknown artifact: {artifact_id}")
+
+    def _save(
+        self, artifact_id: str, suffix: str, write: Callable[[Path], object]
+    ) -> str:
+        path = self.root / f"{artifact_id}{suffix}"
+        if path.exists():
+            os.utime(path)
+        else:
+            self.root.mkdir(parents=True, exist_ok=True)
+            write(path)
+            self.cleanup(keep=path)
+        return artifact_id
+
+    def put_frame(self, frame: pd.DataFrame) -> str:
+        """Stores a table and returns its artifact ID."""
+        if not isinstance(frame.index, pd.RangeIndex):
+            frame = frame.reset_index()  # keep group labels and other named indexes
+        frame = frame.set_axis(frame.columns.map(str), axis=1)
+        digest = hashlib.sha256(str(frame.dtypes.to_dict()).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy())
+        if PARQUET:
+            return self._save(
+                digest.hexdigest()[:16],
+                ".parquet",
+                lambda path: frame.to_parquet(path, index=False),
+            )
+        return self._save(
+            digest.hexdigest()[:16],
+            ".csv",
+            lambda path: frame.to_csv(path, index=False),
+        )
+
+    def put_text(self, text: str) -> str:
+        """Stores text and returns its artifact ID."""
+        return self._save(
+            hashlib.sha256(text.encode()).hexdigest()[:16],
+            ".txt",
+            lambda path: path.write_text(text, encoding="utf-8"),
+        )
+
+    def read_frame(self, artifact_id: str) -> pd.DataFrame:
+        path = self._path(artifact_id)
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    def summary(self, artifact_id: str, head: int = 5) -> str:
+        """A compact description of the artifact to send instead of its content."""
+        path = self._path(artifact_id)
+        if path.suffix == ".txt":
+            text = path.read_text(encoding="utf-8")
+            more = "..." if len(text) > PREVIEW_CHARS else ""
+            return (
+                f"[Artifact {artifact_id}: text with {len(_text_lines(text))} lines]\n"
+                f"{text[:PREVIEW_CHARS]}{more}"
+            )
+        frame = self.read_frame(artifact_id)
+        summary = (
+            f"[Artifact {artifact_id}: table with {len(frame)} rows and columns "
+            f"{', '.join(map(str, frame.columns))}]\n"
+            f"First {min(head, len(frame))} rows:\n{frame.head(head).to_string()}"
+        )
+        numeric = frame.select_dtypes("number")
+        if not numeric.empty:
+            stats = numeric.agg(["sum", "mean", "min", "max"]).T
+            summary += f"\nSummary statistics:\n{stats.to_string()}"
+        return summary
+
+    def page(
+        self, artifact_id: str, offset: int = 0, limit: int = 50, max_chars: int = 8000
+    ) -> str:
+        """
+        Returns rows (or lines) `offset` to `offset + limit` of the artifact. Text
+        pages end early once they would exceed `max_chars`.
+        """
+        path = self._path(artifact_id)
+        offset, limit = max(offset, 0), max(limit, 0)
+        if path.suffix == ".txt":
+            lines = _text_lines(path.read_text(encoding="utf-8"))
+            total, end, size = len(lines), offset, 0
+            for line in lines[offset : offset + limit]:
+                size += len(line) + 1
+                if end > offset and size > max_chars:
+                    break
+                end += 1
+            content = "\n".join(lines[offset:end])
+        else:
+            frame = self.read_frame(artifact_id)
+            total = len(frame)
+            content = frame.iloc[offset : offset + limit].to_string()
+            end = min(offset + limit, total)
+        return f"[Artifact {artifact_id}: items {offset}-{end} of {total}]\n{content}"
+
+    def cleanup(self, keep: Path | None = None) -> None:
+        """Deletes least recently used artifacts until the store fits `max_bytes`."""
+        paths = sorted(self.root.glob("*.*"), key=lambda p: p.stat().st_mtime)
+        total = sum(path.stat().st_size for path in paths)
+        for path in paths:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                total -= path.stat().st_size
+                path.unlink()
+
+
+def store_result(cfg: DictConfig, result: object) -> str:
+    """Stores a table or long text result and returns its reference and summary."""
+    store = ArtifactStore(cfg.root, cfg.max_bytes)
+    if isinstance(result, pd.Series):
+        result = result.to_frame()
+    if isinstance(result, pd.DataFrame):
+        artifact_id = store.put_frame(result)
+    else:
+        artifact_id = store.put_text(str(result))
+    return (
+        store.summary(artifact_id)
+        + f"\nUse read_artifact with artifact_id={artifact_id} to read the rest."
+    )
+
+
+def read_artifact(
+    root: str, artifact_id: str, offset: int, limit: int, max_chars: int = 8000
+) -> str:
+    """Pages through a stored artifact."""
+    try:
+        return ArtifactStore(root).page(
+            artifact_id, offset, min(limit, MAX_PAGE_ROWS), max_chars
+        )
+    except KeyError as e:
+        return str(e)
@@ -0,0 +1,206 @@
+import json
+import re
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from portfolio_chat.storage.artifacts import PARQUET
+
+SNAPSHOT_FILE = re.compile(r"(\d{4}-\d{2}-\d{2})_(\w+)\.csv")
+
+
+def find_snapshots(data_dir: str | Path) -> dict[str, dict[str, Path]]:
+    """Maps each date in `data_dir` to its `YYYY-MM-DD_<Table>.csv` files by table."""
+    found: dict[str, dict[str, Path]] = {}
+    for path in Path(data_dir).glob("*.csv"):
+        match = SNAPSHOT_FILE.fullmatch(path.name)
+        if match:
+            found.setdefault(match[1], {})[match[2]] = path
+    return found
+
+
+def _row_keys(frame: pd.DataFrame) -> np.ndarray:
+    """Content-derived row keys; identical rows are told apart by occurrence."""
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy(np.uint64)
+    return pd.util.hash_array(hashes + occurrence)
+
+
+def _write_table(frame: pd.DataFrame, directory: Path, name: str) -> None:
+    """Writes a keyed table as Parquet, or CSV if pyarrow is not installed."""
+    if PARQUET:
+        frame.to_parquet(directory / f"{name}.parquet")
+    else:
+        frame.to_csv(directory / f"{name}.csv")
+
+
+def _read_table(directory: Path, name: str) -> pd.DataFrame:
+    path = directory / f"{name}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+    frame = pd.read_csv(directory / f"{name}.csv", dtype={"_key": np.uint64})
+    return frame.set_index("_key")
+
+
+class SnapshotStore:
+    """
+    Stores dated portfolio snapshots as row-level deltas against the previous one.
+
+    The first snapshot, and every `checkpoint_every`-th one after it, is stored in
+    full; all others only keep the keys of removed rows and the added rows. Any
+    snapshot can be materialized by replaying deltas from the nearest checkpoint.
+    Tables are saved as Parquet (CSV if pyarrow is not installed).
+
+    Args:
+        root (str | Path): Directory holding the manifest and encoded snapshots.
+        checkpoint_every (int, optional): Full snapshot interval. Defaults to 12.
+    """
+
+    def __init__(self, root: str | Path, checkpoint_every: int = 12):
+        self.root = Path(root)
+        self.checkpoint_every = checkpoint_every
+        self._manifest_path = self.root / "manifest.json"
+        if self._manifest_path.exists():
+            self.manifest = json.loads(self._manifest_path.read_text())
+        else:
+            self.manifest = {"snapshots": {}}
+        self._latest: tuple[str, dict[str, pd.DataFrame]] | None = None
+
+    @property
+    def dates(self) -> list[str]:
+        return sorted(self.manifest["snapshots"])
+
+    def ingest(self, date: str, files: Mapping[str, str | Path]) -> None:
+        """Adds the snapshot for `date` given a mapping of table name to CSV path.
+
+        Raises:
+            ValueError: If `date` is not later than the latest stored snapshot.
+        """
+        if self.dates and date <= self.dates[-1]:
+            raise ValueError(f"Snapshot {date} is not after {self.dates[-1]}")
+
+        previous = self.materialize(keyed=True) if self.dates else {}
+        full = len(self.dates) % self.checkpoint_every == 0
+        directory = self.root / date
+        directory.mkdir(parents=True, exist_ok=True)
+
+        tables, current = {}, {}
+        for table, path in files.items():
+            frame = pd.read_csv(path, encoding="latin1")
+            frame.index = pd.Index(_row_keys(frame), name="_key")
+            current[table] = frame
+            if full or table not in previous:
+                _write_table(frame, directory, f"{table}.full")
+                tables[table] = "full"
+                continue
+            old = previous[table]
+            removed = old.index.difference(frame.index).to_numpy(np.uint64)
+            added = frame.loc[~frame.index.isin(old.index)]
+            np.save(directory / f"{table}.removed.npy", removed)
+            _write_table(added, directory, f"{table}.added")
+            tables[table] = "delta"
+
+        self.manifest["snapshots"][date] = tables
+        self._manifest_path.write_text(json.dumps(self.manifest, indent=2))
+        self._latest = (date, current)
+
+    def ingest_dir(self, data_dir: str | Path) -> list[str]:
+        """Ingests every `YYYY-MM-DD_<Table>.csv` file set newer than the store.
+
+        Returns:
+            list[str]: The dates that were ingested.
+        """
+        found = find_snapshots(data_dir)
+        latest = self.dates[-1] if self.dates else ""
+        new = sorted(date for date in found if date > latest)
+        for date in new:
+            self.ingest(date, found[date])
+        return new
+
+    def materialize(
+        self, date: str | None = None, keyed: bool = False
+    ) -> dict[str, pd.DataFrame]:
+        """Rebuilds every table of a snapshot. Defaults to the latest snapshot.
+
+        Row order is not preserved; rows added since the last checkpoint come last.
+
+        Raises:
+            KeyError: If the snapshot does not exist or the store is empty.
+        """
+        dates = self.dates
+        if date is None:
+            if not dates:
+                raise KeyError("The snapshot store is empty")
+            date = dates[-1]
+        if self._latest is not None and self._latest[0] == date:
+            tables = self._latest[1]
+        else:
+            if date not in self.manifest["snapshots"]:
+                raise KeyError(f"Unknown snapshot: {date}")
+            *_, (_, tables) = self._replay([date])
+            if date == dates[-1]:
+                self._latest = (date, tables)
+        if keyed:
+            return tables
+        return {name: frame.reset_index(drop=True) for name, frame in tables.items()}
+
+    def series(
+        self,
+        metric: Callable[[dict[str, pd.DataFrame]], float | None],
+        start: str | None = None,
+        end: str | None = None,
+    ) -> pd.Series:
+        """Evaluates `metric` on every snapshot between `start` and `end` inclusive.
+
+        Only the nearest checkpoint and the deltas after it are read from disk.
+        """
+        dates = [
+            d
+            for d in self.dates
+            if (start is None or d >= start) and (end is None or d <= end)
+        ]
+        values = {}
+        for date, tables in self._replay(dates):
+            if date in dates:
+                values[date] = metric(tables)
+        return pd.Series(values, dtype=float)
+
+    def _replay(
+        self, dates: list[str]
+    ) -> Iterator[tuple[str, dict[str, pd.DataFrame]]]:
+        """Yields keyed tables for each snapshot from the checkpoint before `dates`."""
+        if not dates:
+            return
+        all_dates = self.dates
+        snapshots = self.manifest["snapshots"]
+        checkpoint = all_dates.index(dates[0])
+        while checkpoint > 0 and "delta" in snapshots[all_dates[checkpoint]].values():
+            checkpoint -= 1
+        tables: dict[str, pd.DataFrame] = {}
+        for date in all_dates[checkpoint : all_dates.index(dates[-1]) + 1]:
+            directory = self.root / date
+            tables = dict(tables)
+            for table, kind in snapshots[date].items():
+                if kind == "full":
+                    tables[table] = _read_table(directory, f"{table}.full")
+                    continue
+                removed = np.load(directory / f"{table}.removed.npy")
+                added = _read_table(directory, f"{table}.added")
+                kept = tables[table].drop(index=removed)
+                tables[table] = pd.concat([kept, added]) if len(added) else kept
+            yield date, tables
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest dated portfolio snapshots.")
+    parser.add_argument("data_dir", help="Directory with YYYY-MM-DD_<Table>.csv files")
+    parser.add_argument("root", help="Snapshot store directory")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    ingested = store.ingest_dir(args.data_dir)
+    print(f"Ingested {len(ingested)} snapshot(s): {', '.join(ingested) or '-'}")
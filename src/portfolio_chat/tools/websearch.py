@@ -3,6 +3,7 @@ from datetime import datetime
 import requests
 
 URL = "https://gnews.io/api/v4/"
+session = requests.Session()  # keeps the connection to GNews alive between calls
 
 
 def format_request_output(response: requests.Response) -> str:
@@ -40,7 +41,7 @@ def top_headlines(api_key: str, category: str | None = None):
             "Invalid category. Choose from: " + ", ".join(valid_categories)
         )
 
-    response = requests.get(
+    response = session.get(
         f"{URL}top-headlines",
         params={"country": "us", "lang": "en", "category": category, "apikey": api_key},  # type: ignore
     )
@@ -48,9 +49,14 @@ def top_headlines(api_key: str, category: str | None = None):
     return format_request_output(response)
 
 
+def warm_connection():
+    """Opens the connection to GNews so the next request skips the handshake."""
+    session.head(URL, timeout=5)
+
+
 def webquery(query: str, api_key: str):
     """Search for articles based on a query string."""
-    response = requests.get(
+    response = session.get(
         f"{URL}search",
         params={  # type: ignore
             "q": query,
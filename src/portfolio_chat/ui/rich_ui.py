@@ -23,7 +23,9 @@ class UI:
         )
         self.console = Console(theme=theme)
         self.session = PromptSession(
-            completer=WordCompleter(["/help", "/reset", "/quit"], ignore_case=True)
+            completer=WordCompleter(
+                ["/help", "/reset", "/save", "/resume", "/quit"], ignore_case=True
+            )
         )
 
     def banner(self, msg: str) -> None: